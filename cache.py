@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class PayloadStore:
+    """
+    SQLite-backed store for encoded tool responses, keyed by (symbol, method).
+    It outlives the process, so a respawned stdio server answers repeat lookups
+    without going back to Selenium. One connection is shared by the worker threads,
+    and a lock serializes them — the sqlite3 module only guarantees that when SQLite
+    itself was built in serialized mode (sqlite3.threadsafety == 3).
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS payloads ("
+            "symbol TEXT, method TEXT, fetched_at REAL, json TEXT, "
+            "PRIMARY KEY (symbol, method))"
+        )
+
+    def get(self, symbol: str, method: str, ttl: float) -> Optional[tuple[str, float]]:
+        """Return (json, fetched_at) if a response younger than ttl seconds is stored."""
+        # Wall-clock time on purpose — fetched_at has to stay meaningful across restarts
+        with self.lock:
+            return self.conn.execute(
+                "SELECT json, fetched_at FROM payloads WHERE symbol = ? AND method = ? AND fetched_at > ?",
+                (symbol, method, time.time() - ttl)
+            ).fetchone()
+
+    def put(self, symbol: str, method: str, text: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO payloads (symbol, method, fetched_at, json) VALUES (?, ?, ?, ?)",
+                (symbol, method, time.time(), text)
+            )
+
+    def delete(self, symbol: Optional[str] = None) -> int:
+        """Delete the stored responses for symbol, or all of them, and return how many rows went."""
+        with self.lock:
+            if symbol:
+                return self.conn.execute("DELETE FROM payloads WHERE symbol = ?", (symbol,)).rowcount
+            return self.conn.execute("DELETE FROM payloads").rowcount
+
+    def count(self, ttl: float) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM payloads WHERE fetched_at > ?", (time.time() - ttl,)
+            ).fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
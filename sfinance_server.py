@@ -1,19 +1,35 @@
-import json
+import asyncio
+import io
 import os
+import sys
 import time
 import argparse
-from contextlib import asynccontextmanager
-from datetime import datetime, timedelta
-from typing import Optional, Literal
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from weakref import WeakValueDictionary
+from typing import Annotated, Optional, Literal
+import anyio
+import orjson
 import pandas as pd
+from cachetools import Cache, TTLCache
 
 from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from pydantic import AfterValidator, Field, TypeAdapter, ValidationError
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from sfinance.sfinance import SFinance
 from sfinance.exceptions import TickerNotFound, LoginRequiredError
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
 
+from cache import PayloadStore
 from constants import SCREENER_PARAMS, SCREENER_OPERATORS
 
 from dotenv import load_dotenv
@@ -25,38 +41,84 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler(),
+        logging.StreamHandler(sys.stderr),
         logging.FileHandler('sfinance_server.log')
     ]
 )
 logger = logging.getLogger(__name__)
 
+
+class StdoutToStderr(io.TextIOBase):
+    """
+    Stand-in for sys.stdout in stdio mode. sfinance print()s progress and errors,
+    which would corrupt the JSON-RPC stream, so text writes go to stderr while
+    .buffer still points at the real stdout used by the MCP transport.
+    """
+
+    def __init__(self, stdout):
+        self.buffer = stdout.buffer
+
+    def write(self, s: str) -> int:
+        return sys.stderr.write(s)
+
+    def flush(self):
+        sys.stderr.flush()
+
+def env_flag(name: str) -> bool:
+    """True only for an explicit yes (1/true/yes/on) — SFINANCE_DEBUG=0 or false must stay off."""
+    return os.getenv(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
 # ---------------------------------------------------------------------------
 # Shared state — populated once during lifespan, reused by all tool calls
 # ---------------------------------------------------------------------------
 
 app_state: dict = {}
+# Every Ticker opens a tab in the one shared Chrome driver, so browser work runs one call at a time
+browser_lock = threading.Lock()
+# Dedicated pool for blocking sfinance work and response encoding, so none of it runs on the event loop
+executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sfinance")
+# At most this many pool threads may sit waiting on browser_lock, leaving the rest free for parsing/encoding
+BROWSER_SLOTS = 4
 CACHE_EXPIRY_HOURS = 24
+CACHE_EXPIRY_SECONDS = CACHE_EXPIRY_HOURS * 3600
+# Past this age a persisted response is still served, but refreshed in the background (stale-while-revalidate)
+CACHE_REFRESH_HOURS = 12
+CACHE_REFRESH_SECONDS = CACHE_REFRESH_HOURS * 3600
+CACHE_MAX_TICKERS = 256
+# Encoded tool responses, keyed by (symbol, tool) — screener.in data changes at most daily
+RESULT_CACHE_SECONDS = 3600
+RESULT_CACHE_MAX = 1024
+# Encoded responses are also persisted here for CACHE_EXPIRY_HOURS, surviving server restarts
+CACHE_DB = os.getenv('CACHE_DB', "sfinance_cache.db")
+# Include tracebacks in tool error replies — off by default, they leak paths and cost the model tokens
+DEBUG = env_flag('SFINANCE_DEBUG')
+# Tickers loaded in the background at startup so the first request for them is a cache hit.
+# warm_cache validates and normalizes them like tool arguments.
+WARM_TICKERS = [s.strip() for s in os.getenv('WARM_TICKERS', "INFY,TCS,RELIANCE,HDFCBANK,ICICIBANK").split(",") if s.strip()]
 
 
 # ---------------------------------------------------------------------------
 # Lifespan — SFinance initializes and logs in ONCE at server startup
 # ---------------------------------------------------------------------------
 
-@asynccontextmanager
-async def lifespan(server: FastMCP):
+async def start_sfinance() -> SFinance:
     chrome_path = os.getenv('CHROME_PATH', "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe")
     screener_url = os.getenv('SCREENER_URL', "https://www.screener.in/")
 
     logger.info("Starting SFinance server — initializing browser...")
-    sf = SFinance(screener_url, chrome_path)
+    try:
+        sf = await run_blocking(SFinance, screener_url, chrome_path)
+    except Exception as e:
+        logger.error(f"Browser initialization failed: {e}")
+        raise
 
     login_successful = False
     email = os.getenv('SCREENER_EMAIL')
     password = os.getenv('SCREENER_PASSWORD')
     if email and password:
         try:
-            sf.login(email, password)
+            await run_in_browser(sf.login, email, password)
             login_successful = sf.fetcher.is_logged_in()
             logger.info(f"Login successful: {login_successful}")
         except Exception as e:
@@ -66,15 +128,48 @@ async def lifespan(server: FastMCP):
 
     app_state["sf"] = sf
     app_state["login_successful"] = login_successful
-    app_state["ticker_cache"] = {}
+    return sf
 
-    yield
 
-    logger.info("Shutting down — closing browser...")
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    # Bounded LRU with TTL — expired entries are dropped lazily on access.
+    # TTLCache is not thread-safe: the caches are only read and written on the event loop thread,
+    # worker threads receive a ticker or return a result but never touch the caches themselves.
+    app_state["ticker_cache"] = TickerCache(maxsize=CACHE_MAX_TICKERS, ttl=CACHE_EXPIRY_SECONDS)
+    # Weak values — a symbol's lock disappears once no request holds it, so bad symbols don't pile up
+    app_state["symbol_locks"] = WeakValueDictionary()
+    app_state["result_cache"] = TTLCache(maxsize=RESULT_CACHE_MAX, ttl=RESULT_CACHE_SECONDS)
+    app_state["payload_store"] = PayloadStore(CACHE_DB)
+    # Hit/miss counters per cache layer, reported by get_cache_stats
+    app_state["cache_counts"] = Counter()
+    # Background refreshes of stale responses, keyed like result_cache — dedupes them and keeps the tasks alive
+    app_state["refreshing"] = {}
+    # Response loads in progress, keyed like result_cache — concurrent identical calls await the same one
+    app_state["inflight"] = {}
+    # Created here, not at import — an asyncio semaphore binds to the first event loop that waits on it
+    app_state["browser_slots"] = asyncio.Semaphore(BROWSER_SLOTS)
+    # Browser startup and login run in the background so the MCP handshake doesn't wait on Chrome
+    app_state["sf_ready"] = asyncio.create_task(start_sfinance())
+
+    warm_task = asyncio.create_task(warm_cache(WARM_TICKERS))
+
     try:
-        sf.close()
-    except Exception as e:
-        logger.error(f"Error closing SFinance: {e}")
+        yield
+    finally:
+        # Shielded — servers are stopped by cancelling their task group (Ctrl-C, in-memory clients),
+        # which would otherwise abort the first await below and leave Chrome running
+        with anyio.CancelScope(shield=True):
+            warm_task.cancel()
+            for task in app_state["refreshing"].values():
+                task.cancel()
+            logger.info("Shutting down — closing browser...")
+            try:
+                sf = await app_state["sf_ready"]
+                await run_in_browser(sf.close)
+            except Exception as e:
+                logger.error(f"Error closing SFinance: {e}")
+            app_state["payload_store"].close()
 
 
 # ---------------------------------------------------------------------------
@@ -88,6 +183,66 @@ mcp = FastMCP("sfinance-server", lifespan=lifespan)
 # Helpers
 # ---------------------------------------------------------------------------
 
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call in a worker thread so the event loop keeps serving requests."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+async def run_in_browser(func, *args, **kwargs):
+    """Like run_blocking, but for calls that drive the shared Selenium browser."""
+    def locked():
+        with browser_lock:
+            return func(*args, **kwargs)
+    async with app_state["browser_slots"]:
+        return await run_blocking(locked)
+
+
+async def get_sfinance() -> SFinance:
+    """Wait for startup initialization to finish and return the shared SFinance instance."""
+    ready: asyncio.Task = app_state["sf_ready"]
+    # A failed startup (e.g. Chrome missing or crashed on launch) is retried by the next request
+    if ready.done() and not ready.cancelled() and ready.exception() is not None:
+        logger.info("Retrying browser initialization...")
+        ready = app_state["sf_ready"] = asyncio.create_task(start_sfinance())
+    return await ready
+
+
+def session_lost(e: Exception) -> bool:
+    """True when the Chrome session itself is gone (crashed or killed), not just one page failing."""
+    if isinstance(e, InvalidSessionIdException):
+        return True
+    message = str(e).lower()
+    return isinstance(e, WebDriverException) and ("not reachable" in message or "disconnected" in message)
+
+
+async def restart_sfinance(dead: Optional[SFinance]):
+    """Replace a browser whose session died with a fresh, logged-in one. Concurrent callers share one restart."""
+    if dead is None or app_state.get("sf") is not dead:
+        return  # not started yet, or another request already replaced it
+    logger.warning("Browser session lost — restarting Chrome")
+    app_state["sf"] = None
+    # Every cached tab died with the old session, so start empty rather than closing them one by one
+    app_state["ticker_cache"] = TickerCache(maxsize=CACHE_MAX_TICKERS, ttl=CACHE_EXPIRY_SECONDS)
+    app_state["sf_ready"] = asyncio.create_task(start_sfinance())
+    try:
+        await run_blocking(dead.close)
+    except Exception as e:
+        logger.debug(f"Closing dead browser: {e}")
+
+
+async def with_browser_retry(call):
+    """Await call(), and if the browser session died underneath it, restart Chrome and try once more."""
+    sf = app_state.get("sf")
+    try:
+        return await call()
+    except Exception as e:
+        if not session_lost(e):
+            raise
+    await restart_sfinance(sf)
+    return await call()
+
+
 def is_logged_in() -> bool:
     sf = app_state.get("sf")
     if sf is not None:
@@ -95,110 +250,432 @@ def is_logged_in() -> bool:
     return app_state.get("login_successful", False)
 
 
-def get_ticker(symbol: str):
-    symbol = symbol.upper()
-    cache: dict = app_state["ticker_cache"]
-    now = datetime.now()
+def open_ticker(sf: SFinance, symbol: str):
+    """
+    sf.ticker(symbol) — run with browser_lock held. sfinance opens the ticker's tab before loading
+    the page, so when that load fails (e.g. TickerNotFound) the tab it left behind is closed here.
+    """
+    driver = sf.fetcher.get_driver()
+    before = set(driver.window_handles)
+    try:
+        return sf.ticker(symbol)
+    except Exception:
+        try:
+            for handle in driver.window_handles:
+                if handle not in before:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+        except Exception as e:
+            logger.error(f"Could not close the tab left by {symbol}: {e}")
+        raise
+
 
-    if symbol in cache:
-        ticker, cache_time = cache[symbol]
-        if now - cache_time < timedelta(hours=CACHE_EXPIRY_HOURS):
-            logger.info(f"Cache hit for {symbol}")
+def close_ticker(ticker):
+    """Close a ticker's tab, then focus the browser's first tab so later navigation has a live window."""
+    with browser_lock:
+        ticker.close()
+        try:
+            ticker.driver.switch_to.window(ticker.driver.window_handles[0])
+        except Exception as e:
+            logger.error(f"Could not refocus browser after closing {ticker.symbol}: {e}")
+
+
+class TickerCache(TTLCache):
+    """
+    Ticker cache that closes a ticker's tab in the shared browser once it leaves the cache —
+    LRU eviction, TTL expiry or clear_cache — instead of leaving one open tab per symbol ever seen.
+    A ticker that leaves while calls are still using it (see borrow) is closed after the last one ends.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # In-flight calls per ticker, and tickers that left the cache while some were still running
+        self.users: Counter = Counter()
+        self.retired: set = set()
+
+    @contextmanager
+    def borrow(self, ticker):
+        """Keep ticker's tab open for the duration of the with-block, even if it leaves the cache meanwhile."""
+        self.users[ticker] += 1
+        try:
+            yield ticker
+        finally:
+            self.users[ticker] -= 1
+            if not self.users[ticker]:
+                del self.users[ticker]
+                if ticker in self.retired:
+                    self.retired.remove(ticker)
+                    self._close(ticker)
+
+    def __delitem__(self, key):
+        ticker = Cache.__getitem__(self, key)
+        try:
+            super().__delitem__(key)
+        finally:
+            self._release(ticker)
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for _, ticker in expired:
+            self._release(ticker)
+        return expired
+
+    def clear(self):
+        # Newer cachetools clear without going through __delitem__, so pop entries one by one
+        self.expire()
+        while True:
+            try:
+                self.popitem()
+            except KeyError:
+                break
+
+    def _release(self, ticker):
+        if self.users[ticker]:
+            self.retired.add(ticker)
+        else:
+            self._close(ticker)
+
+    @staticmethod
+    def _close(ticker):
+        asyncio.get_running_loop().run_in_executor(executor, close_ticker, ticker)
+
+
+def is_stale(ticker, max_age: Optional[float]) -> bool:
+    return max_age is not None and time.monotonic() - ticker.loaded_at > max_age
+
+
+async def get_ticker(symbol: str, max_age: Optional[float] = None):
+    """
+    Return the cached Ticker for symbol, creating it on a miss. Callers pass the symbol already upper-cased.
+    With max_age, a cached ticker whose page was loaded longer ago than that is replaced by a fresh one.
+    """
+    cache: TickerCache = app_state["ticker_cache"]
+    counts: Counter = app_state["cache_counts"]
+
+    ticker = cache.get(symbol)
+    if ticker is not None and not is_stale(ticker, max_age):
+        logger.debug(f"Cache hit for {symbol}")
+        counts["ticker_hits"] += 1
+        return ticker
+
+    # Single-flight per symbol — concurrent callers wait for one load instead of opening duplicate tabs
+    locks: WeakValueDictionary[str, asyncio.Lock] = app_state["symbol_locks"]
+    async with locks.setdefault(symbol, asyncio.Lock()):
+        ticker = cache.get(symbol)
+        if ticker is not None and not is_stale(ticker, max_age):
             return ticker
-        logger.info(f"Cache expired for {symbol}")
-        del cache[symbol]
-
-    logger.info(f"Creating ticker for {symbol}...")
-    t0 = time.time()
-    ticker = app_state["sf"].ticker(symbol)
-    logger.info(f"Ticker {symbol} loaded in {time.time() - t0:.2f}s")
-    cache[symbol] = (ticker, now)
+
+        counts["ticker_misses"] += 1
+        logger.info(f"{'Reloading' if ticker is not None else 'Creating'} ticker for {symbol}...")
+        t0 = time.monotonic()
+        sf = await get_sfinance()
+        ticker = await run_in_browser(open_ticker, sf, symbol)
+        ticker.loaded_at = time.monotonic()
+        logger.info(f"Ticker {symbol} loaded in {time.monotonic() - t0:.2f}s")
+        # Drop a stale predecessor first — cache assignment alone would skip closing its tab
+        cache.pop(symbol, None)
+        cache[symbol] = ticker
     return ticker
 
 
-def clear_expired_cache():
-    cache: dict = app_state.get("ticker_cache", {})
-    now = datetime.now()
-    expired = [s for s, (_, t) in cache.items()
-               if now - t >= timedelta(hours=CACHE_EXPIRY_HOURS)]
-    for s in expired:
-        del cache[s]
-        logger.info(f"Cleared expired cache for {s}")
+@asynccontextmanager
+async def borrowed_ticker(symbol: str, max_age: Optional[float] = None):
+    """get_ticker, holding the ticker's tab open until the caller's block is done with it."""
+    ticker = await get_ticker(symbol, max_age)
+    with app_state["ticker_cache"].borrow(ticker):
+        yield ticker
+
+
+async def warm_cache(symbols: list[str]):
+    try:
+        await app_state["sf_ready"]
+    except Exception:
+        return  # browser failed to start; leave retrying it to incoming requests
+    # Sequential on purpose — ticker loads share the browser lock, so request-path calls can interleave
+    for entry in symbols:
+        try:
+            symbol = SYMBOL_ADAPTER.validate_python(entry)
+        except ValidationError:
+            logger.warning(f"Skipping malformed WARM_TICKERS entry {entry!r}")
+            continue
+        try:
+            await get_ticker(symbol)
+        except Exception as e:
+            logger.warning(f"Could not pre-warm {symbol}: {e}")
+    if symbols:
+        logger.info(f"Pre-warmed ticker cache: {len(app_state['ticker_cache'])} entries")
+
+
+# Compact JSON by default; set PRETTY_JSON=1 for indented output when debugging by hand
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+if env_flag("PRETTY_JSON"):
+    JSON_OPTIONS |= orjson.OPT_INDENT_2
+
+
+async def cached_result(key: tuple, build) -> str:
+    """
+    Return the JSON for key (symbol, method, *args) from memory, then from the on-disk store,
+    or await build() and cache the JSON it returns in both. build() always gets max_age, so a
+    response is never encoded from a page older than CACHE_REFRESH_HOURS. A stored response older
+    than that is returned as-is while it is rebuilt in the background.
+    """
+    cache: TTLCache = app_state["result_cache"]
+    counts: Counter = app_state["cache_counts"]
+    text = cache.get(key)
+    if text is not None:
+        counts["result_hits"] += 1
+        return text
+
+    inflight: dict[tuple, asyncio.Task] = app_state["inflight"]
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.create_task(load_result(key, build))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    else:
+        counts["result_coalesced"] += 1
+    # Shielded so one caller going away doesn't cancel the load the others are waiting on
+    return await asyncio.shield(task)
+
+
+# sfinance getters swallow scrape/parse errors and return an empty frame or dict, so an empty
+# reply may be a transient failure — it is returned but never cached, in memory or on disk
+EMPTY_RESULTS = {"[]", "{}"}
+
+
+async def load_result(key: tuple, build) -> str:
+    cache: TTLCache = app_state["result_cache"]
+    counts: Counter = app_state["cache_counts"]
+    store: PayloadStore = app_state["payload_store"]
+    symbol, method = key[0], ":".join(key[1:])
+    row = await run_blocking(store.get, symbol, method, CACHE_EXPIRY_SECONDS)
+    if row is None or row[0] in EMPTY_RESULTS:
+        counts["result_misses"] += 1
+        # The cached ticker may be up to CACHE_EXPIRY_HOURS old — don't store its page as fresh
+        text = await build(max_age=CACHE_REFRESH_SECONDS)
+        if text in EMPTY_RESULTS:
+            return text
+        await run_blocking(store.put, symbol, method, text)
+    else:
+        counts["persisted_hits"] += 1
+        text, fetched_at = row
+        if time.time() - fetched_at > CACHE_REFRESH_SECONDS:
+            refresh_result(key, build)
+    cache[key] = text
+    return text
+
+
+def refresh_result(key: tuple, build):
+    """Rebuild a stale response in the background, at most once at a time per key."""
+    refreshing: dict[tuple, asyncio.Task] = app_state["refreshing"]
+    if key in refreshing:
+        return
+    name = ":".join(key)
+
+    async def refresh():
+        try:
+            # The ticker's page is likely as old as the response, so have build reload it first
+            text = await build(max_age=CACHE_REFRESH_SECONDS)
+            if text in EMPTY_RESULTS:
+                logger.warning(f"Background refresh of {name} came back empty — keeping the stored reply")
+                return
+            await run_blocking(app_state["payload_store"].put, key[0], ":".join(key[1:]), text)
+            app_state["result_cache"][key] = text
+            logger.info(f"Refreshed {name}")
+        except Exception as e:
+            logger.warning(f"Background refresh of {name} failed: {e}")
+        finally:
+            del refreshing[key]
+
+    refreshing[key] = asyncio.create_task(refresh())
+
+
+def _json_default(obj):
+    # Values pandas can leave in object/extension columns that orjson has no encoding for
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return str(obj)
+    raise TypeError
+
+
+def _dump(obj) -> str:
+    return orjson.dumps(obj, default=_json_default, option=JSON_OPTIONS).decode()
+
+
+def df_columns(df: pd.DataFrame) -> tuple[list[str], list[list]]:
+    """Column names and each column's values as plain Python objects, ready for orjson."""
+    # orjson cannot encode pandas Timestamps, so datetime columns (tz-aware too) go out as
+    # strings, with NaT kept missing rather than turned into "NaT"
+    date_cols = df.select_dtypes(['datetime', 'datetimetz']).columns
+    if len(date_cols):
+        df = df.assign(**{c: df[c].astype(str).where(df[c].notna(), None) for c in date_cols})
+    # tolist() unboxes each column in C; callers zip the columns back into rows
+    names = [str(c) for c in df.columns]
+    return names, [df.iloc[:, i].tolist() for i in range(df.shape[1])]
 
 
 def df_to_json(df: pd.DataFrame) -> str:
+    # No rows is a normal outcome (e.g. no concalls yet), not an error
     if df.empty:
-        return json.dumps({"error": "No data available"})
-    return df.to_json(orient='records', indent=2)
+        return "[]"
+    names, columns = df_columns(df)
+    return _dump([dict(zip(names, row)) for row in zip(*columns)])
+
+
+def tool_error(e: Exception) -> ToolError:
+    """
+    Log a failed call and wrap it in the ToolError FastMCP reports to the client with isError set.
+    Expected sfinance errors are logged briefly, anything else with its traceback.
+    """
+    if isinstance(e, (TickerNotFound, LoginRequiredError)):
+        logger.warning(str(e))
+    else:
+        logger.exception("Tool call failed", exc_info=e)
+    message = str(e)
+    if DEBUG:
+        message += "\n" + "".join(traceback.format_exception(e))
+    return ToolError(message)
+
+
+async def embed_error(call) -> str:
+    """For fan-out tools: one item's JSON, or its error in its place so the other items still come back."""
+    try:
+        return await call
+    except ToolError as e:
+        return _dump({"error": str(e)})
+
+
+# Ticker methods that drive the shared browser; the rest only parse the page loaded when the ticker was created
+BROWSER_METHODS = {
+    "get_peer_comparison",
+    "get_announcements",
+    "get_annual_reports",
+    "get_credit_ratings",
+    "get_concalls",
+}
+
+
+def fetch_json(func, *args) -> str:
+    """Call a blocking ticker method and encode its result — both on the calling worker thread."""
+    result = func(*args)
+    return df_to_json(result) if isinstance(result, pd.DataFrame) else _dump(result)
+
+
+async def ticker_json(symbol: str, method: str, *args) -> str:
+    """Call ticker.<method>(*args) for a normalized symbol and return the JSON, going through the response cache."""
+    async def build(max_age: float):
+        async with borrowed_ticker(symbol, max_age) as ticker:
+            run = run_in_browser if method in BROWSER_METHODS else run_blocking
+            return await run(fetch_json, getattr(ticker, method), *args)
+    try:
+        return await with_browser_retry(partial(cached_result, (symbol, method, *args), build))
+    except Exception as e:
+        raise tool_error(e) from e
+
+
+def normalize_symbol(symbol: str) -> str:
+    # Interned so every cache key and lock for a symbol shares one string object
+    return sys.intern(symbol.upper())
+
+
+# NSE/BSE symbol (e.g. INFY, M&M, BAJAJ-AUTO, 500325). FastMCP compiles this into the tool's
+# argument validator once at registration, so malformed input is rejected before any browser work
+# and tools receive the symbol already upper-cased.
+Symbol = Annotated[str, Field(min_length=1, max_length=20, pattern=r"^[A-Za-z0-9&._-]+$"),
+                   AfterValidator(normalize_symbol)]
+# The same checks for symbols that don't arrive as tool arguments (WARM_TICKERS)
+SYMBOL_ADAPTER = TypeAdapter(Symbol)
 
 
 # ---------------------------------------------------------------------------
 # Tools — ticker data
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
-async def get_overview(symbol: str) -> str:
+# Tools return JSON already encoded as text. output_schema=None stops FastMCP from also sending it
+# as structuredContent {"result": "<the same JSON, escaped>"}, which more than doubled every reply.
+
+@mcp.tool(output_schema=None)
+async def get_overview(symbol: Symbol) -> str:
     """Get company overview for an Indian stock listed on NSE/BSE. E.g. INFY, TCS, RELIANCE."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return json.dumps(ticker.get_overview(), indent=2)
+    return await ticker_json(symbol, "get_overview")
 
 
-@mcp.tool()
-async def get_income_statement(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_income_statement(symbol: Symbol) -> str:
     """Get income statement for an Indian company. Data sourced from screener.in."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_income_statement())
+    return await ticker_json(symbol, "get_income_statement")
 
 
-@mcp.tool()
-async def get_balance_sheet(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_balance_sheet(symbol: Symbol) -> str:
     """Get balance sheet for an Indian company listed on NSE/BSE."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_balance_sheet())
+    return await ticker_json(symbol, "get_balance_sheet")
 
 
-@mcp.tool()
-async def get_cash_flow(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_cash_flow(symbol: Symbol) -> str:
     """Get cash flow statement for an Indian company."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_cash_flow())
+    return await ticker_json(symbol, "get_cash_flow")
 
 
-@mcp.tool()
-async def get_quarterly_results(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_quarterly_results(symbol: Symbol) -> str:
     """Get quarterly results for an Indian company from screener.in."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_quarterly_results())
+    return await ticker_json(symbol, "get_quarterly_results")
 
 
-@mcp.tool()
-async def get_shareholding(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_shareholding(symbol: Symbol) -> str:
     """Get shareholding pattern for an Indian company (promoter, institutional, public holdings)."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_shareholding())
+    return await ticker_json(symbol, "get_shareholding")
 
 
-@mcp.tool()
-async def get_peer_comparison(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_peer_comparison(symbol: Symbol) -> str:
     """Get peer comparison for an Indian company — P/E, market cap, revenue growth vs industry peers."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    return df_to_json(ticker.get_peer_comparison())
+    return await ticker_json(symbol, "get_peer_comparison")
+
+
+@mcp.tool(output_schema=None)
+async def get_financials(
+    symbol: Symbol,
+    sections: Optional[list[Literal["income_statement", "balance_sheet", "cash_flow",
+                                    "quarterly_results", "shareholding"]]] = None
+) -> str:
+    """
+    Get several financial statements for an Indian company in one call.
+    sections: any of 'income_statement', 'balance_sheet', 'cash_flow', 'quarterly_results', 'shareholding'
+    (default: income_statement, balance_sheet and cash_flow). Returns an object keyed by section.
+    """
+    sections = sections or ["income_statement", "balance_sheet", "cash_flow"]
+    results = await asyncio.gather(*(embed_error(ticker_json(symbol, f"get_{s}")) for s in sections))
+    # Each section is already encoded (and cached) — embed it as-is rather than decoding and re-encoding
+    return _dump({s: orjson.Fragment(text) for s, text in zip(sections, results)})
+
+
+@mcp.tool(output_schema=None)
+async def get_overview_batch(symbols: list[Symbol]) -> str:
+    """Get company overviews for several Indian stocks in one call, e.g. a watchlist. Returns an object keyed by symbol."""
+    symbols = list(dict.fromkeys(symbols))
+    # Bound how many new tabs a single batch can queue up on the shared browser
+    limit = asyncio.Semaphore(4)
+
+    async def overview(symbol: str) -> str:
+        async with limit:
+            return await embed_error(ticker_json(symbol, "get_overview"))
+
+    results = await asyncio.gather(*(overview(s) for s in symbols))
+    return _dump({s: orjson.Fragment(text) for s, text in zip(symbols, results)})
 
 
 # ---------------------------------------------------------------------------
 # Tools — document access (login required)
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def get_announcements(
-    symbol: str,
+    symbol: Symbol,
     tab: Literal["recent", "important"] = "recent"
 ) -> str:
     """
@@ -206,42 +683,30 @@ async def get_announcements(
     Returns title, subtitle, and URL for each announcement.
     tab: 'recent' (default) or 'important'
     """
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    df = ticker.get_announcements(tab=tab)
-    return df_to_json(df)
+    return await ticker_json(symbol, "get_announcements", tab)
 
 
-@mcp.tool()
-async def get_annual_reports(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_annual_reports(symbol: Symbol) -> str:
     """Get list of annual reports with download URLs for an Indian stock. Login required."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    df = ticker.get_annual_reports()
-    return df_to_json(df)
+    return await ticker_json(symbol, "get_annual_reports")
 
 
-@mcp.tool()
-async def get_credit_ratings(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_credit_ratings(symbol: Symbol) -> str:
     """Get credit rating documents with download URLs for an Indian stock. Login required."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    df = ticker.get_credit_ratings()
-    return df_to_json(df)
+    return await ticker_json(symbol, "get_credit_ratings")
 
 
-@mcp.tool()
-async def get_concalls(symbol: str) -> str:
+@mcp.tool(output_schema=None)
+async def get_concalls(symbol: Symbol) -> str:
     """Get conference call documents (transcripts, PPTs, recordings) for an Indian stock. Login required."""
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    df = ticker.get_concalls()
-    return df_to_json(df)
+    return await ticker_json(symbol, "get_concalls")
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def download_documents(
-    symbol: str,
+    symbol: Symbol,
     doc_type: Literal["announcements", "annual_reports", "credit_ratings", "concalls"],
     folder_path: str,
     link_type: Literal["transcript", "ppt", "rec", "all"] = "all",
@@ -259,32 +724,45 @@ async def download_documents(
     period: for concalls — filter by period string (e.g. 'Q3 2024')
     n: max number of documents to download
     """
-    clear_expired_cache()
-    ticker = get_ticker(symbol)
-    downloaded = ticker.download_documents(
-        doc_type=doc_type,
-        folder_path=folder_path,
-        link_type=link_type,
-        tab=tab,
-        year=year,
-        period=period,
-        n=n
-    )
+    async def download() -> list:
+        async with borrowed_ticker(symbol) as ticker:
+            return await run_in_browser(
+                ticker.download_documents,
+                doc_type=doc_type,
+                folder_path=folder_path,
+                link_type=link_type,
+                tab=tab,
+                year=year,
+                period=period,
+                n=n
+            )
+    try:
+        downloaded = await with_browser_retry(download)
+    except Exception as e:
+        raise tool_error(e) from e
     result = {
-        "symbol": symbol.upper(),
+        "symbol": symbol,
         "doc_type": doc_type,
         "folder_path": folder_path,
         "downloaded_count": len(downloaded),
         "files": downloaded
     }
-    return json.dumps(result, indent=2)
+    return _dump(result)
 
 
 # ---------------------------------------------------------------------------
 # Tools — screener
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+# Static reply, encoded once at import rather than on every unauthenticated call
+LOGIN_REQUIRED_JSON = _dump({
+    "error": "Login required",
+    "message": "Stock screening requires login to screener.in",
+    "instruction": "Set SCREENER_EMAIL and SCREENER_PASSWORD environment variables and restart the server"
+})
+
+
+@mcp.tool(output_schema=None)
 async def screen_stocks(
     query: str,
     sort: str = "",
@@ -295,28 +773,53 @@ async def screen_stocks(
     Screen Indian stocks based on financial criteria. Login required.
     query: e.g. 'Piotroski score > 7 AND Return on equity > 15'
     Supported operators: +, -, /, *, >, <, AND, OR
+    Results are columnar: "columns" lists the field names once, and each entry of "rows"
+    is one stock's values in that order.
     """
-    if not is_logged_in():
-        return json.dumps({
-            "error": "Login required",
-            "message": "Stock screening requires login to screener.in",
-            "instruction": "Set SCREENER_EMAIL and SCREENER_PASSWORD environment variables and restart the server"
-        }, indent=2)
-
-    screener = app_state["sf"].screener()
-    df = screener.load_raw_query(query=query, sort=sort, order=order, page=page)
-    result = {
-        "query": query,
-        "sort": sort,
-        "order": order,
-        "page": page,
-        "total_results": len(df),
-        "results": df.to_dict('records') if not df.empty else []
-    }
-    return json.dumps(result, indent=2)
+    async def load() -> pd.DataFrame:
+        screener = (await get_sfinance()).screener()
+        return await run_in_browser(screener.load_raw_query, query=query, sort=sort, order=order, page=page)
+    try:
+        # Wait for startup before checking login — a failed startup is reported like any other error
+        await get_sfinance()
+        if not is_logged_in():
+            return LOGIN_REQUIRED_JSON
+        df = await with_browser_retry(load)
+    except Exception as e:
+        raise tool_error(e) from e
+
+    def encode() -> str:
+        # Column names once instead of repeated in every row — screener pages are wide and long
+        names, columns = df_columns(df)
+        return _dump({
+            "query": query,
+            "sort": sort,
+            "order": order,
+            "page": page,
+            "total_results": len(df),
+            "columns": names,
+            "rows": list(zip(*columns))
+        })
+    return await run_blocking(encode)
+
+
+# SCREENER_PARAMS and SCREENER_OPERATORS are static, so every reply is encoded once at import
+SCREENING_PARAMS_JSON = {
+    category: _dump({
+        "category": category,
+        "parameters": params,
+        "operators": SCREENER_OPERATORS
+    })
+    for category, params in SCREENER_PARAMS.items()
+}
+SCREENING_PARAMS_JSON["all"] = _dump({
+    "parameters": SCREENER_PARAMS,
+    "operators": SCREENER_OPERATORS,
+    "note": "Use exact parameter names in queries. Case sensitive."
+})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def get_screening_parameters(
     category: Literal["ratios", "growth", "profitability", "annual", "quarterly",
                       "balance_sheet", "cash_flow", "price", "all"] = "all"
@@ -325,74 +828,81 @@ async def get_screening_parameters(
     Get available parameters for stock screening with descriptions and examples.
     category: filter by category or 'all' for everything
     """
-    if category == "all":
-        result = {
-            "parameters": SCREENER_PARAMS,
-            "operators": SCREENER_OPERATORS,
-            "note": "Use exact parameter names in queries. Case sensitive."
-        }
-    elif category in SCREENER_PARAMS:
-        result = {
-            "category": category,
-            "parameters": SCREENER_PARAMS[category],
-            "operators": SCREENER_OPERATORS
-        }
-    else:
-        result = {
-            "error": f"Unknown category: {category}",
-            "available_categories": list(SCREENER_PARAMS.keys()) + ["all"]
-        }
-    return json.dumps(result, indent=2)
+    text = SCREENING_PARAMS_JSON.get(category)
+    if text is not None:
+        return text
+    return _dump({
+        "error": f"Unknown category: {category}",
+        "available_categories": list(SCREENING_PARAMS_JSON)
+    })
 
 
 # ---------------------------------------------------------------------------
 # Tools — cache / utility
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def get_cache_stats() -> str:
     """Get ticker cache statistics and current login status."""
-    cache: dict = app_state.get("ticker_cache", {})
-    now = datetime.now()
-    active = sum(1 for _, t in cache.values()
-                 if now - t < timedelta(hours=CACHE_EXPIRY_HOURS))
-    expired = len(cache) - active
-    return json.dumps({
-        "active_cache_entries": active,
-        "expired_cache_entries": expired,
-        "total_cache_entries": len(cache),
+    cache: TickerCache = app_state["ticker_cache"]
+    results: TTLCache = app_state["result_cache"]
+    counts: Counter = app_state["cache_counts"]
+    cache.expire()
+    results.expire()
+    return _dump({
+        "active_cache_entries": len(cache),
+        "max_cache_entries": cache.maxsize,
         "cache_expiry_hours": CACHE_EXPIRY_HOURS,
+        "cached_results": len(results),
+        "persisted_results": await run_blocking(app_state["payload_store"].count, CACHE_EXPIRY_SECONDS),
+        "hits": {layer: counts[f"{layer}_hits"] for layer in ("result", "persisted", "ticker")},
+        "coalesced": counts["result_coalesced"],
+        "misses": {layer: counts[f"{layer}_misses"] for layer in ("result", "ticker")},
         "login_status": is_logged_in()
-    }, indent=2)
+    })
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def clear_cache(symbol: Optional[str] = None) -> str:
     """
-    Clear cached ticker objects to force fresh data on next request.
+    Clear cached ticker objects and tool responses to force fresh data on next request.
     symbol: specific symbol to clear, or omit to clear everything.
     """
     cache: dict = app_state.get("ticker_cache", {})
+    results: dict = app_state.get("result_cache", {})
     if symbol:
-        symbol = symbol.upper()
+        symbol = normalize_symbol(symbol)
+        keys = [k for k in results if k[0] == symbol]
+        for key in keys:
+            del results[key]
+        stored = await run_blocking(app_state["payload_store"].delete, symbol)
+        tickers = 0
         if symbol in cache:
             del cache[symbol]
-            return json.dumps({"message": f"Cleared cache for {symbol}"}, indent=2)
-        return json.dumps({"message": f"No cache found for {symbol}"}, indent=2)
-    count = len(cache)
+            tickers = 1
+        # Right after a restart only the stored responses exist, so report each layer separately
+        cleared = {"tickers": tickers, "responses": len(keys), "stored_responses": stored}
+        if not any(cleared.values()):
+            return _dump({"message": f"No cache found for {symbol}", **cleared})
+        return _dump({"message": f"Cleared cache for {symbol}", **cleared})
+    cache.expire()
+    results.expire()
+    cleared = {"tickers": len(cache), "responses": len(results)}
     cache.clear()
-    return json.dumps({"message": f"Cleared all cache ({count} entries)"}, indent=2)
+    results.clear()
+    cleared["stored_responses"] = await run_blocking(app_state["payload_store"].delete)
+    return _dump({"message": "Cleared all cache", **cleared})
 
 
-@mcp.tool()
+@mcp.tool(output_schema=None)
 async def check_login_status() -> str:
     """Check whether the server is logged into screener.in."""
     logged_in = is_logged_in()
-    return json.dumps({
+    return _dump({
         "logged_in": logged_in,
         "message": "Logged in to screener.in" if logged_in else "Not logged in.",
         "note": "Set SCREENER_EMAIL and SCREENER_PASSWORD environment variables for automatic login"
-    }, indent=2)
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -463,23 +973,26 @@ def growth_stocks(
     )
 
 
+# Everything after the user's criteria is fixed text, so it is assembled once here
+CUSTOM_SCREENER_GUIDE = (
+    "Please help me build a custom stock screening query. Available parameters:\n\n"
+    "**Financial Ratios**: Price to Earning, Price to book value, Return on equity, "
+    "Return on assets, Debt to equity, Current ratio, Quick ratio\n\n"
+    "**Growth Metrics**: Sales growth 3Years, Profit growth 3Years, EPS growth 3Years, "
+    "Sales growth 5Years\n\n"
+    "**Profitability**: OPM (Operating Profit Margin), NPM (Net Profit Margin), "
+    "Return on capital employed\n\n"
+    "**Quality Scores**: Piotroski score, Earnings yield\n\n"
+    "**Market Data**: Market Capitalization, Dividend yield, Promoter holding\n\n"
+    "**Operators**: >, <, AND, OR\n\n"
+    "Example: 'Return on equity > 20 AND Debt to equity < 0.5 AND Sales growth 3Years > 15'"
+)
+
+
 @mcp.prompt()
 def custom_screener(criteria: str) -> str:
     """Build a custom stock screening query from plain-language criteria."""
-    return (
-        f"Based on your criteria: '{criteria}'\n\n"
-        "Please help me build a custom stock screening query. Available parameters:\n\n"
-        "**Financial Ratios**: Price to Earning, Price to book value, Return on equity, "
-        "Return on assets, Debt to equity, Current ratio, Quick ratio\n\n"
-        "**Growth Metrics**: Sales growth 3Years, Profit growth 3Years, EPS growth 3Years, "
-        "Sales growth 5Years\n\n"
-        "**Profitability**: OPM (Operating Profit Margin), NPM (Net Profit Margin), "
-        "Return on capital employed\n\n"
-        "**Quality Scores**: Piotroski score, Earnings yield\n\n"
-        "**Market Data**: Market Capitalization, Dividend yield, Promoter holding\n\n"
-        "**Operators**: >, <, AND, OR\n\n"
-        "Example: 'Return on equity > 20 AND Debt to equity < 0.5 AND Sales growth 3Years > 15'"
-    )
+    return f"Based on your criteria: '{criteria}'\n\n" + CUSTOM_SCREENER_GUIDE
 
 
 # ---------------------------------------------------------------------------
@@ -505,11 +1018,25 @@ if __name__ == "__main__":
         default=int(os.getenv("PORT", "8000")),
         help="Port for HTTP transport (default: 8000)"
     )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        default=env_flag("HTTP_GZIP"),
+        help="HTTP transport: reply with plain JSON, gzipped above 4 KB for clients that accept it"
+    )
     args = parser.parse_args()
 
     if args.transport == "http":
         logger.info(f"Starting HTTP server on {args.host}:{args.port}")
-        mcp.run(transport="http", host=args.host, port=args.port)
+        if args.gzip:
+            # Event-stream replies are never gzipped, so switch tool replies to plain JSON bodies
+            mcp.run(
+                transport="http", host=args.host, port=args.port, json_response=True,
+                middleware=[Middleware(GZipMiddleware, minimum_size=4096)]
+            )
+        else:
+            mcp.run(transport="http", host=args.host, port=args.port)
     else:
         logger.info("Starting stdio server")
+        sys.stdout = StdoutToStderr(sys.stdout)
         mcp.run()
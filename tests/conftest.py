@@ -0,0 +1,192 @@
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+from fastmcp import Client
+
+import sfinance_server as server
+
+
+class FakeDriver:
+    """The shared Chrome driver, reduced to its window handles."""
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.current = "main"
+        self.opened = 0
+
+    @property
+    def switch_to(self):
+        driver = self
+
+        class SwitchTo:
+            @staticmethod
+            def window(handle):
+                assert handle in driver.window_handles, f"no such window: {handle}"
+                driver.current = handle
+        return SwitchTo()
+
+    def open_tab(self) -> str:
+        self.opened += 1
+        handle = f"tab{self.opened}"
+        self.window_handles.append(handle)
+        self.current = handle
+        return handle
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+
+class FakeFetcher:
+    def __init__(self):
+        self.logged_in = False
+        self.driver = FakeDriver()
+
+    def is_logged_in(self):
+        return self.logged_in
+
+    def get_driver(self):
+        return self.driver
+
+
+class FakeTicker:
+    """Stands in for sfinance's Ticker: opens its own tab, which close() closes."""
+
+    def __init__(self, symbol: str, browser: "FakeBrowser", driver: FakeDriver = None):
+        self.symbol = symbol
+        self.browser = browser
+        self.driver = driver or FakeDriver()
+        # Like sfinance, the tab is opened before the page is loaded and checked
+        self.window_handle = self.driver.open_tab()
+        if symbol in browser.unknown:
+            raise server.TickerNotFound(f"Ticker '{symbol}' not found")
+        self.closed = False
+
+    def _call(self, name: str):
+        self.browser.calls.append((self.symbol, name))
+        if self.browser.delay:
+            time.sleep(self.browser.delay)
+        if self.browser.session_lost:
+            self.browser.session_lost = False
+            raise server.InvalidSessionIdException("invalid session id")
+        if self.closed:
+            raise RuntimeError(f"no such window: {self.symbol}")
+        # failing holds symbols whose every call fails, or (symbol, method) pairs for a single call
+        if self.symbol in self.browser.failing or (self.symbol, name) in self.browser.failing:
+            raise RuntimeError(f"{name} failed for {self.symbol}")
+
+    def get_overview(self):
+        self._call("get_overview")
+        return {"Name": self.symbol, "About": f"About {self.symbol}"}
+
+    def get_income_statement(self):
+        self._call("get_income_statement")
+        return self.browser.frames.get(self.symbol, pd.DataFrame({"Metric": ["Sales"], "Mar 2024": [100.0]}))
+
+    def get_balance_sheet(self):
+        self._call("get_balance_sheet")
+        return pd.DataFrame({"Metric": ["Reserves"], "Mar 2024": [50.0]})
+
+    def get_cash_flow(self):
+        self._call("get_cash_flow")
+        return pd.DataFrame({"Metric": ["Net Cash Flow"], "Mar 2024": [-5.0]})
+
+    def get_announcements(self, tab="recent"):
+        self._call("get_announcements")
+        return pd.DataFrame({"Title": [f"{self.symbol} {tab}"]})
+
+    def close(self):
+        self.closed = True
+        self.driver.switch_to.window(self.window_handle)
+        self.driver.close()
+
+
+class FakeScreener:
+    """Stands in for sfinance's Screener; the page it returns is whatever browser.screen holds."""
+
+    def __init__(self, browser: "FakeBrowser"):
+        self.browser = browser
+
+    def load_raw_query(self, query, sort="", order="desc", page=1):
+        self.browser.calls.append((query, "load_raw_query"))
+        return self.browser.screen
+
+
+class FakeBrowser:
+    """Everything the fakes did, across every SFinance instance the server created."""
+
+    def __init__(self):
+        self.instances = []
+        self.tickers = []
+        self.calls = []
+        self.frames = {}
+        self.delay = 0.0
+        self.session_lost = False
+        self.failing = set()
+        # Well-formed symbols screener.in has no page for
+        self.unknown = set()
+        self.screen = pd.DataFrame()
+        # Number of upcoming SFinance() constructions that fail, as when Chrome is missing
+        self.start_failures = 0
+
+    def sfinance(self, url, chrome_path):
+        browser = self
+        if self.start_failures:
+            self.start_failures -= 1
+            raise server.WebDriverException("cannot find Chrome binary")
+
+        class FakeSFinance:
+            def __init__(self):
+                self.fetcher = FakeFetcher()
+                self.closed = False
+
+            def login(self, email, password):
+                self.fetcher.logged_in = True
+
+            def screener(self):
+                return FakeScreener(browser)
+
+            def ticker(self, symbol):
+                ticker = FakeTicker(symbol, browser, self.fetcher.driver)
+                browser.tickers.append(ticker)
+                return ticker
+
+            def close(self):
+                self.closed = True
+
+        sf = FakeSFinance()
+        self.instances.append(sf)
+        return sf
+
+
+@pytest.fixture
+def browser(monkeypatch, tmp_path):
+    fake = FakeBrowser()
+    monkeypatch.setattr(server, "SFinance", fake.sfinance)
+    monkeypatch.setattr(server, "CACHE_DB", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(server, "WARM_TICKERS", [])
+    monkeypatch.setenv("SCREENER_EMAIL", "user@example.com")
+    monkeypatch.setenv("SCREENER_PASSWORD", "secret")
+    return fake
+
+
+@pytest.fixture
+def serve(browser):
+    """Run scenario(client) against the server, with its lifespan, over an in-memory MCP client."""
+    def run(scenario):
+        async def main():
+            async with Client(server.mcp) as client:
+                return await scenario(client)
+        return asyncio.run(main())
+    return run
+
+
+async def wait_until(predicate, timeout: float = 2.0):
+    """Poll predicate on the event loop — tab closes and refreshes finish on worker threads."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
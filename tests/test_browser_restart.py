@@ -0,0 +1,48 @@
+import sfinance_server as server
+from conftest import wait_until
+
+
+def test_lost_session_restarts_browser_and_retries(browser, serve):
+    async def scenario(client):
+        await client.call_tool("get_overview", {"symbol": "TCS"})
+        browser.session_lost = True
+
+        result = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert "About INFY" in result.content[0].text
+        assert len(browser.instances) == 2
+        dead, fresh = browser.instances
+        assert dead.closed and not fresh.closed
+        assert fresh.fetcher.is_logged_in()
+        assert server.app_state["sf"] is fresh
+        # Tabs of the dead session are dropped; only the retried ticker is cached
+        assert list(server.app_state["ticker_cache"]) == ["INFY"]
+        assert [s for s, name in browser.calls if name == "get_overview"] == ["TCS", "INFY", "INFY"]
+    serve(scenario)
+
+
+def test_other_errors_do_not_restart_browser(browser, serve):
+    browser.failing.add("INFY")
+
+    async def scenario(client):
+        result = await client.call_tool("get_overview", {"symbol": "INFY"}, raise_on_error=False)
+        assert result.is_error
+        assert len(browser.instances) == 1
+    serve(scenario)
+
+
+def test_failed_startup_is_retried_by_the_next_call(browser, serve):
+    # Startup in the lifespan fails, then so does the first call's own attempt
+    browser.start_failures = 2
+
+    async def scenario(client):
+        await wait_until(lambda: server.app_state["sf_ready"].done())
+        first = await client.call_tool("get_overview", {"symbol": "INFY"}, raise_on_error=False)
+        assert first.is_error
+        assert "cannot find Chrome binary" in first.content[0].text
+        assert not browser.instances
+
+        second = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert "About INFY" in second.content[0].text
+        assert len(browser.instances) == 1
+        assert server.app_state["sf"] is browser.instances[0]
+    serve(scenario)
@@ -0,0 +1,31 @@
+import pytest
+
+import sfinance_server as server
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1", True), ("true", True), ("Yes", True), (" on ", True),
+    ("0", False), ("false", False), ("no", False), ("off", False), ("", False),
+])
+def test_env_flag_needs_an_explicit_yes(monkeypatch, value, expected):
+    monkeypatch.setenv("SFINANCE_TEST_FLAG", value)
+    assert server.env_flag("SFINANCE_TEST_FLAG") is expected
+
+
+def test_env_flag_is_off_when_unset(monkeypatch):
+    monkeypatch.delenv("SFINANCE_TEST_FLAG", raising=False)
+    assert server.env_flag("SFINANCE_TEST_FLAG") is False
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_tracebacks_reach_the_client_only_in_debug(browser, serve, monkeypatch, debug):
+    monkeypatch.setattr(server, "DEBUG", debug)
+    browser.failing.add("INFY")
+
+    async def scenario(client):
+        result = await client.call_tool("get_overview", {"symbol": "INFY"}, raise_on_error=False)
+        assert result.is_error
+        text = result.content[0].text
+        assert text.startswith("get_overview failed for INFY")
+        assert ("Traceback" in text) is debug
+    serve(scenario)
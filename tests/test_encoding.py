@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from sfinance_server import df_to_json
+
+
+def test_missing_values_and_datetimes_encode_as_plain_json():
+    df = pd.DataFrame({
+        "listed": pd.to_datetime(["2024-03-31 09:15", "2024-06-30 15:30"]).tz_localize("Asia/Kolkata"),
+        "results": pd.to_datetime(["2024-04-18", None]),
+        "holders": pd.array([1200, pd.NA], dtype="Int64"),
+        "rating": pd.array([pd.NA, "AAA"], dtype="string"),
+        "pe": [24.5, np.nan],
+    })
+    assert df_to_json(df) == (
+        '[{"listed":"2024-03-31 09:15:00+05:30","results":"2024-04-18","holders":1200,"rating":null,"pe":24.5},'
+        '{"listed":"2024-06-30 15:30:00+05:30","results":null,"holders":null,"rating":"AAA","pe":null}]'
+    )
+
+
+def test_empty_frame_encodes_as_empty_list():
+    assert df_to_json(pd.DataFrame()) == "[]"
@@ -0,0 +1,61 @@
+import orjson
+
+INCOME = [{"Metric": "Sales", "Mar 2024": 100.0}]
+BALANCE = [{"Metric": "Reserves", "Mar 2024": 50.0}]
+CASH_FLOW = [{"Metric": "Net Cash Flow", "Mar 2024": -5.0}]
+
+
+def reply(result) -> dict:
+    assert not result.is_error
+    return orjson.loads(result.content[0].text)
+
+
+def overview(symbol: str) -> dict:
+    return {"Name": symbol, "About": f"About {symbol}"}
+
+
+def test_financials_are_keyed_by_section(browser, serve):
+    async def scenario(client):
+        default = reply(await client.call_tool("get_financials", {"symbol": "INFY"}))
+        assert default == {"income_statement": INCOME, "balance_sheet": BALANCE, "cash_flow": CASH_FLOW}
+
+        picked = reply(await client.call_tool(
+            "get_financials", {"symbol": "INFY", "sections": ["cash_flow", "income_statement"]}
+        ))
+        assert list(picked) == ["cash_flow", "income_statement"]
+        # One ticker serves every section
+        assert len(browser.tickers) == 1
+    serve(scenario)
+
+
+def test_failing_section_is_reported_in_its_place(browser, serve):
+    browser.failing.add(("INFY", "get_balance_sheet"))
+
+    async def scenario(client):
+        financials = reply(await client.call_tool("get_financials", {"symbol": "INFY"}))
+        assert financials["income_statement"] == INCOME
+        assert financials["cash_flow"] == CASH_FLOW
+        assert financials["balance_sheet"] == {"error": "get_balance_sheet failed for INFY"}
+    serve(scenario)
+
+
+def test_overview_batch_is_keyed_by_symbol_without_duplicates(browser, serve):
+    async def scenario(client):
+        batch = reply(await client.call_tool(
+            "get_overview_batch", {"symbols": ["infy", "TCS", "INFY", "tcs", "WIPRO"]}
+        ))
+        assert batch == {s: overview(s) for s in ["INFY", "TCS", "WIPRO"]}
+        assert sorted(s for s, name in browser.calls if name == "get_overview") == ["INFY", "TCS", "WIPRO"]
+    serve(scenario)
+
+
+def test_failing_symbol_is_reported_in_its_place(browser, serve):
+    browser.failing.add("TCS")
+
+    async def scenario(client):
+        batch = reply(await client.call_tool("get_overview_batch", {"symbols": ["INFY", "TCS", "WIPRO"]}))
+        assert list(batch) == ["INFY", "TCS", "WIPRO"]
+        assert batch["INFY"] == overview("INFY")
+        assert batch["WIPRO"] == overview("WIPRO")
+        assert batch["TCS"] == {"error": "get_overview failed for TCS"}
+    serve(scenario)
@@ -0,0 +1,47 @@
+import asyncio
+import sqlite3
+import sys
+
+import pytest
+
+import sfinance_server as server
+from conftest import wait_until
+
+
+def test_client_disconnect_closes_browser_and_store(browser, serve):
+    async def scenario(client):
+        await client.call_tool("get_overview", {"symbol": "INFY"})
+        return server.app_state["payload_store"]
+
+    store = serve(scenario)
+    assert [sf.closed for sf in browser.instances] == [True]
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.conn.execute("SELECT 1")
+
+
+@pytest.mark.parametrize("run", range(2))
+def test_contended_browser_calls_work_in_every_event_loop(browser, serve, run):
+    # More concurrent browser calls than BROWSER_SLOTS, so callers wait on the semaphore —
+    # one left over from an earlier event loop would fail them all
+    browser.delay = 0.02
+    symbols = [f"SYM{i}" for i in range(2 * server.BROWSER_SLOTS)]
+
+    async def scenario(client):
+        results = await asyncio.gather(
+            *(client.call_tool("get_announcements", {"symbol": s}) for s in symbols)
+        )
+        assert not any(r.is_error for r in results)
+    serve(scenario)
+
+
+def test_warm_tickers_are_validated_and_normalized(browser, serve, monkeypatch):
+    monkeypatch.setattr(server, "WARM_TICKERS", ["infy", "IN FY", "A" * 21, "m&m", "INFY"])
+
+    async def scenario(client):
+        await wait_until(lambda: len(browser.tickers) == 2 and server.app_state["cache_counts"]["ticker_hits"] == 1)
+        assert [t.symbol for t in browser.tickers] == ["INFY", "M&M"]
+        keys = list(server.app_state["ticker_cache"])
+        assert keys == ["INFY", "M&M"]
+        # Same interned strings as the keys tool calls use
+        assert all(k is sys.intern(k) for k in keys)
+    serve(scenario)
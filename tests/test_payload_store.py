@@ -0,0 +1,66 @@
+import pytest
+
+import cache
+from cache import PayloadStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PayloadStore(str(tmp_path / "cache.db"))
+    yield store
+    store.close()
+
+
+def test_put_then_get_returns_json_and_fetch_time(store, clock):
+    store.put("INFY", "get_overview", '{"Name":"Infosys"}')
+    assert store.get("INFY", "get_overview", ttl=60) == ('{"Name":"Infosys"}', clock[0])
+    assert store.get("INFY", "get_balance_sheet", ttl=60) is None
+
+
+def test_put_replaces_previous_reply(store, clock):
+    store.put("INFY", "get_overview", "old")
+    clock[0] += 10
+    store.put("INFY", "get_overview", "new")
+    assert store.get("INFY", "get_overview", ttl=60) == ("new", clock[0])
+
+
+def test_rows_older_than_ttl_are_not_returned_or_counted(store, clock):
+    store.put("INFY", "get_overview", "{}")
+    clock[0] += 30
+    store.put("TCS", "get_overview", "{}")
+    clock[0] += 31
+    assert store.get("INFY", "get_overview", ttl=60) is None
+    assert store.get("TCS", "get_overview", ttl=60) is not None
+    assert store.count(ttl=60) == 1
+    assert store.count(ttl=3600) == 2
+
+
+def test_delete_one_symbol_or_everything(store, clock):
+    store.put("INFY", "get_overview", "{}")
+    store.put("INFY", "get_balance_sheet", "[]")
+    store.put("TCS", "get_overview", "{}")
+    assert store.delete("INFY") == 2
+    assert store.count(ttl=60) == 1
+    assert store.get("TCS", "get_overview", ttl=60) is not None
+    assert store.delete("INFY") == 0
+    assert store.delete() == 1
+    assert store.count(ttl=60) == 0
+
+
+def test_replies_survive_reopening(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    first = PayloadStore(path)
+    first.put("INFY", "get_overview", '{"Name":"Infosys"}')
+    first.close()
+    second = PayloadStore(path)
+    try:
+        assert second.get("INFY", "get_overview", ttl=60) == ('{"Name":"Infosys"}', clock[0])
+    finally:
+        second.close()
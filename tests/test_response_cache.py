@@ -0,0 +1,140 @@
+import asyncio
+
+import orjson
+import pandas as pd
+
+import sfinance_server as server
+from conftest import wait_until
+
+
+def income_calls(browser) -> int:
+    return sum(name == "get_income_statement" for _, name in browser.calls)
+
+
+def test_empty_reply_is_not_cached_or_persisted(browser, serve):
+    browser.frames["INFY"] = pd.DataFrame()
+
+    async def scenario(client):
+        first = await client.call_tool("get_income_statement", {"symbol": "INFY"})
+        assert first.content[0].text == "[]"
+        assert ("INFY", "get_income_statement") not in server.app_state["result_cache"]
+        assert server.app_state["payload_store"].count(server.CACHE_EXPIRY_SECONDS) == 0
+
+        # The scrape recovers — the next call must go back to the page rather than replay "[]"
+        del browser.frames["INFY"]
+        second = await client.call_tool("get_income_statement", {"symbol": "INFY"})
+        assert "Sales" in second.content[0].text
+        assert income_calls(browser) == 2
+        assert server.app_state["payload_store"].count(server.CACHE_EXPIRY_SECONDS) == 1
+    serve(scenario)
+
+
+def overview_calls(browser) -> int:
+    return sum(name == "get_overview" for _, name in browser.calls)
+
+
+def test_concurrent_identical_calls_share_one_load(browser, serve):
+    browser.delay = 0.2
+
+    async def scenario(client):
+        results = await asyncio.gather(
+            *(client.call_tool("get_overview", {"symbol": "infy"}) for _ in range(5))
+        )
+        assert {r.content[0].text for r in results} == {'{"Name":"INFY","About":"About INFY"}'}
+        assert overview_calls(browser) == 1
+        assert len(browser.tickers) == 1
+        counts = server.app_state["cache_counts"]
+        assert counts["result_misses"] == 1
+        assert counts["result_coalesced"] == 4
+
+        # Later calls are answered from memory
+        await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert overview_calls(browser) == 1
+        assert counts["result_hits"] == 1
+    serve(scenario)
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached(browser, serve):
+    browser.delay = 0.1
+    browser.failing.add("INFY")
+
+    async def scenario(client):
+        results = await asyncio.gather(
+            *(client.call_tool("get_overview", {"symbol": "INFY"}, raise_on_error=False) for _ in range(3))
+        )
+        assert all(r.is_error for r in results)
+        assert overview_calls(browser) == 1
+        assert not server.app_state["inflight"]
+
+        browser.failing.clear()
+        result = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert "About INFY" in result.content[0].text
+        assert overview_calls(browser) == 2
+    serve(scenario)
+
+
+def test_stale_reply_is_served_then_refreshed_once(browser, serve):
+    async def scenario(client):
+        await client.call_tool("get_overview", {"symbol": "INFY"})
+        state = server.app_state
+        key = ("INFY", "get_overview")
+        # Age the stored reply and the cached page past CACHE_REFRESH_HOURS (but within the expiry)
+        age = server.CACHE_REFRESH_SECONDS + 3600
+        state["payload_store"].conn.execute(
+            "UPDATE payloads SET fetched_at = fetched_at - ?, json = ?", (age, '{"Name":"stale"}')
+        )
+        state["ticker_cache"]["INFY"].loaded_at -= age
+        state["result_cache"].clear()
+        browser.delay = 0.3
+
+        first = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert first.content[0].text == '{"Name":"stale"}'
+        # A second store hit while the refresh is still running must not start another one
+        state["result_cache"].clear()
+        second = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert second.content[0].text == '{"Name":"stale"}'
+        assert len(state["refreshing"]) == 1
+
+        await wait_until(lambda: not state["refreshing"])
+        assert overview_calls(browser) == 2
+        # The refresh reloaded the old page in a new tab and closed the old one
+        assert len(browser.tickers) == 2
+        await wait_until(lambda: browser.tickers[0].closed)
+        fresh = '{"Name":"INFY","About":"About INFY"}'
+        assert state["result_cache"][key] == fresh
+        assert state["payload_store"].get("INFY", "get_overview", server.CACHE_REFRESH_SECONDS)[0] == fresh
+        third = await client.call_tool("get_overview", {"symbol": "INFY"})
+        assert third.content[0].text == fresh
+    serve(scenario)
+
+
+def test_clear_cache_reports_what_it_cleared(browser, serve):
+    async def fetch(client):
+        await client.call_tool("get_overview", {"symbol": "INFY"})
+        await client.call_tool("get_income_statement", {"symbol": "INFY"})
+
+    async def clear(client, **args):
+        result = await client.call_tool("clear_cache", args)
+        return orjson.loads(result.content[0].text)
+
+    async def running(client):
+        await fetch(client)
+        assert await clear(client, symbol="infy") == {
+            "message": "Cleared cache for INFY", "tickers": 1, "responses": 2, "stored_responses": 2
+        }
+        assert await clear(client, symbol="INFY") == {
+            "message": "No cache found for INFY", "tickers": 0, "responses": 0, "stored_responses": 0
+        }
+        await fetch(client)
+    serve(running)
+
+    async def restarted(client):
+        # A new process starts with empty memory caches, but the stored responses are still there
+        assert await clear(client, symbol="INFY") == {
+            "message": "Cleared cache for INFY", "tickers": 0, "responses": 0, "stored_responses": 2
+        }
+        await fetch(client)
+        assert await clear(client) == {
+            "message": "Cleared all cache", "tickers": 1, "responses": 2, "stored_responses": 2
+        }
+    serve(restarted)
@@ -0,0 +1,38 @@
+import numpy as np
+import orjson
+import pandas as pd
+
+import sfinance_server as server
+
+
+def test_results_are_columnar_with_nan_as_null(browser, serve):
+    browser.screen = pd.DataFrame({
+        "Name": ["Infosys", "TCS"],
+        "CMP Rs.": [1450.5, 3900.0],
+        "ROCE %": [np.nan, 64.3],
+    })
+
+    async def scenario(client):
+        result = await client.call_tool(
+            "screen_stocks", {"query": "Return on capital employed > 20", "sort": "ROCE %", "order": "asc"}
+        )
+        assert orjson.loads(result.content[0].text) == {
+            "query": "Return on capital employed > 20",
+            "sort": "ROCE %",
+            "order": "asc",
+            "page": 1,
+            "total_results": 2,
+            "columns": ["Name", "CMP Rs.", "ROCE %"],
+            "rows": [["Infosys", 1450.5, None], ["TCS", 3900.0, 64.3]],
+        }
+    serve(scenario)
+
+
+def test_screening_without_login_returns_instructions(browser, serve, monkeypatch):
+    monkeypatch.delenv("SCREENER_EMAIL")
+
+    async def scenario(client):
+        result = await client.call_tool("screen_stocks", {"query": "Market Capitalization > 500"})
+        assert result.content[0].text == server.LOGIN_REQUIRED_JSON
+        assert not browser.calls
+    serve(scenario)
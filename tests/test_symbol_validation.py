@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.mark.parametrize("symbol", ["", "IN FY", "A" * 21, "INFY;DROP", "../INFY"])
+def test_malformed_symbols_are_rejected_before_any_browser_call(browser, serve, symbol):
+    async def scenario(client):
+        result = await client.call_tool("get_overview", {"symbol": symbol}, raise_on_error=False)
+        assert result.is_error
+        assert not browser.calls
+        assert not browser.tickers
+    serve(scenario)
+
+
+@pytest.mark.parametrize("symbol, normalized", [
+    ("M&M", "M&M"),
+    ("bajaj-auto", "BAJAJ-AUTO"),
+    ("500325", "500325"),
+    ("A" * 20, "A" * 20),
+])
+def test_valid_symbols_are_accepted_and_upper_cased(browser, serve, symbol, normalized):
+    async def scenario(client):
+        result = await client.call_tool("get_overview", {"symbol": symbol})
+        assert not result.is_error
+        assert [t.symbol for t in browser.tickers] == [normalized]
+    serve(scenario)
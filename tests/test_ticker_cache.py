@@ -0,0 +1,95 @@
+import asyncio
+
+from conftest import FakeBrowser, FakeTicker, wait_until
+from sfinance_server import TickerCache
+
+
+def make_ticker(symbol: str) -> FakeTicker:
+    return FakeTicker(symbol, FakeBrowser())
+
+
+def test_lru_eviction_closes_evicted_tab():
+    async def scenario():
+        cache = TickerCache(maxsize=2, ttl=60)
+        a, b, c = make_ticker("A"), make_ticker("B"), make_ticker("C")
+        cache["A"] = a
+        cache["B"] = b
+        cache["C"] = c
+        await wait_until(lambda: a.closed)
+        assert not b.closed and not c.closed
+        assert "A" not in cache
+    asyncio.run(scenario())
+
+
+def test_expiry_closes_tab():
+    async def scenario():
+        now = [0.0]
+        cache = TickerCache(maxsize=8, ttl=10, timer=lambda: now[0])
+        a = make_ticker("A")
+        cache["A"] = a
+        now[0] = 11.0
+        assert cache.get("A") is None
+        # cachetools drops expired entries lazily, on the next write or expire()
+        cache["B"] = make_ticker("B")
+        await wait_until(lambda: a.closed)
+    asyncio.run(scenario())
+
+
+def test_delete_and_clear_close_tabs():
+    async def scenario():
+        cache = TickerCache(maxsize=8, ttl=60)
+        tickers = {s: make_ticker(s) for s in "ABC"}
+        cache.update(tickers)
+        del cache["A"]
+        await wait_until(lambda: tickers["A"].closed)
+        cache.clear()
+        await wait_until(lambda: all(t.closed for t in tickers.values()))
+        assert len(cache) == 0
+    asyncio.run(scenario())
+
+
+def test_borrowed_ticker_is_closed_after_last_borrower():
+    async def scenario():
+        cache = TickerCache(maxsize=8, ttl=60)
+        a = make_ticker("A")
+        cache["A"] = a
+        with cache.borrow(a):
+            with cache.borrow(a):
+                cache.clear()
+                await asyncio.sleep(0.05)
+                assert not a.closed
+            await asyncio.sleep(0.05)
+            assert not a.closed
+        await wait_until(lambda: a.closed)
+        assert not cache.users and not cache.retired
+    asyncio.run(scenario())
+
+
+def test_clear_cache_during_call_does_not_break_it(browser, serve):
+    browser.delay = 0.3
+
+    async def scenario(client):
+        call = asyncio.create_task(client.call_tool("get_announcements", {"symbol": "infy"}))
+        await wait_until(lambda: browser.calls)
+        await client.call_tool("clear_cache", {})
+        result = await call
+        assert not result.is_error
+        await wait_until(lambda: browser.tickers[0].closed)
+    serve(scenario)
+
+
+def test_unknown_symbol_does_not_leave_a_tab_open(browser, serve):
+    browser.unknown.add("NOSUCHCO")
+
+    async def scenario(client):
+        await client.call_tool("get_overview", {"symbol": "INFY"})
+        for _ in range(2):
+            result = await client.call_tool("get_overview", {"symbol": "NOSUCHCO"}, raise_on_error=False)
+            assert result.is_error
+        driver = browser.instances[0].fetcher.driver
+        assert driver.window_handles == ["main", browser.tickers[0].window_handle]
+        assert driver.current == "main"
+
+        await client.call_tool("clear_cache", {})
+        await wait_until(lambda: driver.window_handles == ["main"])
+    serve(scenario)